@@ -1,26 +1,37 @@
 #!/usr/bin/env python3
 import asyncio
-import base64
+import functools
+import hashlib
 import json
 import logging
 import os
+import re
 import shutil
-import subprocess
 import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, suppress
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 from datetime import datetime
 
+import aiofiles
 import aiohttp
+import ijson
+import orjson
 from fastmcp import FastMCP
 
+# pybase64 decodes with SIMD, the standard library is only used when it is not installed
+try:
+    from pybase64 import b64decode
+except ImportError:
+    from base64 import b64decode
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize FastMCP server
-mcp = FastMCP("Sui Source Code Decompiler")
-
 # Default Sui RPC endpoint
 SUI_RPC_URL = os.getenv("SUI_RPC_URL", "https://fullnode.mainnet.sui.io/")
 WORKDIR = os.getenv("WORKDIR", "/workdir")
@@ -28,6 +39,199 @@ WORKDIR = os.getenv("WORKDIR", "/workdir")
 # GraphQL endpoint for project information
 GRAPHQL_URL = "https://strapi-dev.scand.app/graphql"
 
+# Each package is decompiled into WORKDIR/<package_id>. Least recently used package
+# directories are removed once they take more than this much space
+WORKDIR_MAX_BYTES = int(os.getenv("WORKDIR_MAX_BYTES", str(256 * 1024 * 1024)))
+
+_OUTPUT_DIR_INFO = "The container's workdir is used to save the sources, which is typically the local /tmp/suisource-mcp mounted dir. Sources of each package are saved with .move extension into a subdir named after the package ID (see output_subdir), e.g. /tmp/suisource-mcp/<package_id>/. Previously decompiled packages are kept there as well. Move sources to the target specified directory if needed"
+
+# Persistent decompilation cache. Published package bytecode is immutable, so results
+# are stored per module (keyed by bytecode hash) plus a manifest per package ID
+CACHE_DIR = os.getenv("SUISOURCE_CACHE_DIR", "/var/cache/suisource")
+# Least recently used packages are evicted once cached sources exceed this size
+CACHE_MAX_BYTES = int(os.getenv("SUISOURCE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Guards the cache access metadata, which is updated from worker threads
+_cache_lock = threading.Lock()
+
+# Resolve the revela binary once instead of searching PATH on every module
+REVELA_BIN = shutil.which("revela")
+if REVELA_BIN is None:
+    logger.error("Revela binary not found in PATH, decompilation will fail until it is installed")
+    REVELA_BIN = "revela"
+
+# In-memory cache of package module name lists
+MODULE_LIST_CACHE_TTL = 300
+MODULE_LIST_CACHE_SIZE = 1024
+
+# In-memory cache of GraphQL project information
+PROJECT_INFO_CACHE_TTL = 600
+PROJECT_INFO_CACHE_SIZE = 1024
+
+# Maximum number of project packages whose details are fetched at the same time
+PROJECT_PACKAGE_CONCURRENCY = 16
+
+# Connections kept per host. Each project package issues two requests at once, so the
+# pool is large enough for the whole fan-out to run without waiting for a connection
+HTTP_CONNECTIONS_PER_HOST = 2 * PROJECT_PACKAGE_CONCURRENCY
+
+# Fetch module lists and transactions of all project packages with batched RPC requests.
+# Set SUI_RPC_BATCH=0 for providers that don't support batches or bill them per call
+SUI_RPC_BATCH = os.getenv("SUI_RPC_BATCH", "1") != "0"
+# Sui limits sui_multiGetObjects to 50 objects per request
+RPC_BATCH_SIZE = 50
+
+# Sui object IDs are up to 32 bytes in hex
+_PKG_RE = re.compile(r"0x[0-9a-fA-F]{1,64}")
+
+# sui_getObject options for package downloads. Only bcs.moduleMap is used, other fields
+# just inflate the response
+_RPC_OPTIONS = {"showBcs": True}
+
+# ijson prefixes of the package module map in sui_getObject and sui_multiGetObjects responses
+_MODULE_MAP_PREFIX = "result.data.bcs.moduleMap"
+_MULTI_MODULE_MAP_PREFIX = "result.item.data.bcs.moduleMap"
+
+# CPUs this process may run on, which can be fewer than the host has inside a container
+CPU_COUNT = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 4)
+
+# Limits concurrent revela processes to one per CPU, shared by all running tool calls
+_revela_slots = asyncio.Semaphore(CPU_COUNT)
+
+# Running decompilations keyed by package ID
+_source_code_inflight: Dict[str, asyncio.Task] = {}
+# Packages whose directories get_source_codes still has to hand out, with the number of
+# calls holding each of them
+_workdir_pinned: Dict[str, int] = {}
+# Held while registering a decompilation or pinning packages and while the workdir
+# eviction picks a package directory to remove, so that the directory of a running
+# decompilation or pinned package is never removed
+_workdir_lock = threading.Lock()
+# Runs one workdir eviction at a time, so leftover directories of a failed eviction can
+# be removed without racing another one
+_evict_lock = threading.Lock()
+_EVICTED_PREFIX = ".evicted-"
+
+# Whether revela accepts bytecode piped through /dev/stdin, None until the first module
+# tells either way
+_revela_stdin_supported: Optional[bool] = None if os.path.exists("/dev/stdin") else False
+
+# Staging directory for bytecode files when stdin can't be used, tmpfs keeps them off disk
+_BYTECODE_TMPDIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# The bytecode stream is read only as fast as modules are decompiled, so it has no total
+# timeout. Reading is paused while the queue is full, which also pauses sock_read
+_STREAM_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=30)
+
+# Shared HTTP session, created lazily on first use and reused across tool calls
+_session: Optional[aiohttp.ClientSession] = None
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """
+    Get the shared aiohttp session, creating it on first use.
+    
+    Reusing one session keeps connections to the RPC and GraphQL endpoints alive
+    between calls, so only the first request pays for the TCP and TLS handshakes.
+    
+    Returns:
+        The shared aiohttp.ClientSession
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, limit_per_host=HTTP_CONNECTIONS_PER_HOST, keepalive_timeout=75, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=30)
+        )
+    return _session
+
+
+async def _close_session() -> None:
+    """Close the shared aiohttp session if it was created."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Release shared resources when the server shuts down."""
+    try:
+        yield
+    finally:
+        await _close_session()
+
+
+def _async_ttl_cache(ttl: float, maxsize: int):
+    """
+    Cache the results of an async function taking a single hashable argument.
+    
+    Entries expire after ttl seconds and the least recently used ones are dropped
+    once there are more than maxsize. Empty results (failed lookups) aren't cached.
+    Concurrent calls with the same argument share a single underlying call. The
+    wrapper's cache_get and cache_set let batched lookups share the same cache.
+    
+    Args:
+        ttl: Lifetime of a cached result in seconds
+        maxsize: Maximum number of cached results
+    """
+    def decorator(func):
+        cache: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        inflight: Dict[Any, asyncio.Task] = {}
+        
+        def cache_get(key) -> Any:
+            """Return the cached result for key, or None if there is no live entry."""
+            entry = cache.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            cache.move_to_end(key)
+            return entry[1]
+        
+        def cache_set(key, value) -> None:
+            if not value:
+                return
+            cache[key] = (time.monotonic() + ttl, value)
+            cache.move_to_end(key)
+            while len(cache) > maxsize:
+                cache.popitem(last=False)
+        
+        def store(key, task: asyncio.Task) -> None:
+            inflight.pop(key, None)
+            if not task.cancelled() and task.exception() is None:
+                cache_set(key, task.result())
+        
+        @functools.wraps(func)
+        async def wrapper(key):
+            result = cache_get(key)
+            if result is not None:
+                return result
+            
+            task = inflight.get(key)
+            if task is None:
+                task = asyncio.create_task(func(key))
+                inflight[key] = task
+                task.add_done_callback(functools.partial(store, key))
+            # Shielded so that one cancelled caller doesn't cancel the call for the others
+            return await asyncio.shield(task)
+        
+        def cache_clear() -> None:
+            cache.clear()
+        
+        wrapper.cache_clear = cache_clear
+        wrapper.cache_get = cache_get
+        wrapper.cache_set = cache_set
+        return wrapper
+    return decorator
+
+
+# Initialize FastMCP server
+mcp = FastMCP("Sui Source Code Decompiler", lifespan=lifespan)
+
+# Healthy results are reused for a short time, clients tend to poll health_check
+HEALTH_CACHE_TTL = 30
+_health_cache = {"t": 0.0, "v": None}
+
 @mcp.tool()
 async def health_check() -> dict:
     """
@@ -36,24 +240,37 @@ async def health_check() -> dict:
     Returns:
         dict: Health status information
     """
+    if _health_cache["v"] and time.monotonic() - _health_cache["t"] < HEALTH_CACHE_TTL:
+        return _health_cache["v"]
+    
     try:
-        # Check if revela binary is available
-        result = subprocess.run(
-            ["revela", "--help"],
-            capture_output=True,
-            text=True,
-            timeout=5
+        # Check if revela binary is available. Only the exit code matters, so the output
+        # is discarded instead of being piped and buffered
+        proc = await asyncio.create_subprocess_exec(
+            REVELA_BIN, "--help",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
         )
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
         
-        revela_available = result.returncode == 0
+        revela_available = proc.returncode == 0
         
-        return {
+        result = {
             "status": "healthy" if revela_available else "unhealthy",
             "revela_available": revela_available,
             "sui_rpc_url": SUI_RPC_URL,
             "server": "suisource-mcp",
             "version": "1.0.0"
         }
+        if revela_available:
+            _health_cache["t"] = time.monotonic()
+            _health_cache["v"] = result
+        return result
         
     except Exception as e:
         return {
@@ -66,106 +283,249 @@ async def health_check() -> dict:
         }
 
 
+def _package_dir_complete(output_dir: Path, module_names: List[str]) -> bool:
+    """Check whether every module of a package has a source file in its output directory."""
+    return all((output_dir / f"{module_name}.move").is_file() for module_name in module_names)
+
+
+def _evict_workdir(package_id: str) -> None:
+    """
+    Remove the least recently used package directories from WORKDIR once its size
+    exceeds WORKDIR_MAX_BYTES.
+    
+    Only directories named like a package ID are considered, anything else in the
+    mounted dir is left alone. The directory of the package just served is touched
+    first so that it counts as the most recently used one. Packages that are being
+    decompiled or are pinned by get_source_codes are skipped. The check and a rename
+    out of the way happen under _workdir_lock, so a decompilation starting afterwards
+    gets a fresh directory instead of one that is being deleted. Renamed directories
+    that an earlier eviction failed to delete are removed as well.
+    
+    Args:
+        package_id: Package ID whose sources were just served
+    """
+    os.utime(Path(WORKDIR) / package_id)
+    
+    with _evict_lock:
+        package_dirs = []
+        total_size = 0
+        with os.scandir(WORKDIR) as entries:
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                if entry.name.startswith(_EVICTED_PREFIX):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                    continue
+                if not _PKG_RE.fullmatch(entry.name):
+                    continue
+                with os.scandir(entry.path) as files:
+                    size = sum(f.stat().st_size for f in files if f.is_file(follow_symlinks=False))
+                package_dirs.append((entry.stat().st_mtime, entry.name, size))
+                total_size += size
+        
+        for _, name, size in sorted(package_dirs):
+            if total_size <= WORKDIR_MAX_BYTES:
+                break
+            if name == package_id:
+                continue
+            trash_dir = Path(WORKDIR) / f"{_EVICTED_PREFIX}{name}-{os.getpid()}-{threading.get_ident()}"
+            try:
+                with _workdir_lock:
+                    if name in _source_code_inflight or name in _workdir_pinned:
+                        continue
+                    os.rename(Path(WORKDIR) / name, trash_dir)
+                shutil.rmtree(trash_dir)
+                total_size -= size
+                logger.info(f"Evicted package {name} from the workdir")
+            except Exception as e:
+                logger.error('Failed to delete %s. Reason: %s' % (name, e))
+
+
 async def _get_source_code_impl(package_id: str) -> dict:
     """
     Download bytecode for a Sui package ID and decompile it using revela.
     
+    Concurrent calls for the same package share a single download and decompilation
+    instead of racing on the same files.
+    
     Args:
         package_id: The Sui package ID (hex string starting with 0x)
         
     Returns:
         dict: Status and details of the decompilation process
     """
+    with _workdir_lock:
+        task = _source_code_inflight.get(package_id)
+        if task is None:
+            task = asyncio.create_task(_decompile_package(package_id))
+            _source_code_inflight[package_id] = task
+            task.add_done_callback(lambda _: _source_code_inflight.pop(package_id, None))
+    # Callers get their own copy since get_source_codes edits the result
+    return dict(await asyncio.shield(task))
+
+
+async def _decompile_package(package_id: str) -> dict:
+    """
+    Download bytecode for a Sui package ID and decompile it into WORKDIR/<package_id>.
+    
+    Sources of other packages are left in place, so a package that is already in the
+    workdir is returned right away. Old packages are evicted once the workdir grows
+    past WORKDIR_MAX_BYTES.
+    
+    Args:
+        package_id: The Sui package ID (hex string starting with 0x)
+        
+    Returns:
+        dict: Status and details of the decompilation process
+    """
+    # Reject malformed IDs before touching the workdir or the RPC
+    if not _PKG_RE.fullmatch(package_id):
+        return {
+            "success": False,
+            "error": f"Invalid package ID: {package_id}"
+        }
+    
     try:
-        # Create output directory if it doesn't exist
-        output_dir = Path(WORKDIR)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        for filename in os.listdir(WORKDIR):
-            file_path = os.path.join(WORKDIR, filename)
+        output_dir = Path(WORKDIR) / package_id
+        
+        # Published packages never change, so a cached package skips RPC and revela entirely.
+        # If its sources are still in the workdir there is nothing to copy either
+        cached_hashes = await asyncio.to_thread(_load_cached_package, package_id)
+        if cached_hashes is not None:
             try:
-                if os.path.isfile(file_path) or os.path.islink(file_path):
-                    os.unlink(file_path)
-                elif os.path.isdir(file_path):
-                    shutil.rmtree(file_path)
+                if await asyncio.to_thread(_package_dir_complete, output_dir, list(cached_hashes)):
+                    logger.info(f"Package {package_id} is already decompiled in the workdir")
+                else:
+                    await asyncio.to_thread(_restore_cached_package, cached_hashes, output_dir)
+                    logger.info(f"Restored {len(cached_hashes)} cached modules for package {package_id}")
             except Exception as e:
-                logger.error('Failed to delete %s. Reason: %s' % (file_path, e))
+                logger.warning(f"Failed to restore cached package {package_id}, decompiling again: {e}")
+            else:
+                try:
+                    await asyncio.to_thread(_touch_cached_package, package_id)
+                    await asyncio.to_thread(_evict_workdir, package_id)
+                except Exception as e:
+                    logger.warning(f"Failed to update cache access time for {package_id}: {e}")
+                return _source_code_result(package_id, len(cached_hashes), list(cached_hashes), [], cached=True)
+        
+        # Created in a thread while the RPC download is in flight
+        mkdir_task = asyncio.create_task(asyncio.to_thread(output_dir.mkdir, parents=True, exist_ok=True))
         
         logger.info(f"Starting decompilation for package {package_id}")
         
-        # Step 1: Download bytecode from Sui RPC
+        # Step 1: Stream module bytecode from Sui RPC into a bounded queue, so modules are
+        # decompiled while the rest of the response is still being parsed
         logger.info("Downloading bytecode from Sui RPC...")
-        module_bytecode = await download_package_bytecode(package_id)
+        worker_count = CPU_COUNT
+        queue: asyncio.Queue = asyncio.Queue(maxsize=worker_count * 2)
+        total_modules = 0
+        download_error = None
         
-        if not module_bytecode:
-            return {
-                "success": False,
-                "error": "Failed to download bytecode - package not found or no modules"
-            }
+        async def produce_modules() -> None:
+            nonlocal total_modules, download_error
+            try:
+                async for module_name, base64_bytecode in stream_package_bytecode(package_id):
+                    total_modules += 1
+                    await queue.put((module_name, base64_bytecode))
+            except Exception as e:
+                download_error = str(e)
+                logger.error(f"Error downloading bytecode: {e}")
+            finally:
+                for _ in range(worker_count):
+                    await queue.put(None)
         
-        logger.info(f"Downloaded {len(module_bytecode)} modules")
+        # Step 2: Decompile modules with one worker per CPU. Revela processes are limited to one
+        # per CPU across all packages. Modules whose bytecode was decompiled before are taken
+        # from the cache
+        decompiled_modules = []
+        failed_modules = []
+        module_hashes = {}
         
-        # Step 2: Create temporary directory for bytecode files
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
+        async def decompile_module(module_name: str, bytecode: bytes) -> None:
+            source_file = output_dir / f"{module_name}.move"
+            module_hash = _bytecode_hash(bytecode)
+            module_hashes[module_name] = module_hash
             
-            # Step 3: Decode and save bytecode files
-            bytecode_files = []
-            for module_name, base64_bytecode in module_bytecode.items():
+            if await asyncio.to_thread(_restore_cached_module, module_hash, source_file):
+                decompiled_modules.append(module_name)
+                logger.info(f"Restored cached module: {module_name}.move")
+                return
+            
+            async with _revela_slots:
+                logger.info(f"Decompiling module: {module_name}")
                 try:
-                    # Decode base64 bytecode
-                    bytecode = base64.b64decode(base64_bytecode)
-                    
-                    # Save to temporary file
-                    bytecode_file = temp_path / f"{module_name}.bytecode"
-                    with open(bytecode_file, 'wb') as f:
-                        f.write(bytecode)
-                    
-                    bytecode_files.append((module_name, bytecode_file))
-                    logger.info(f"Saved bytecode for module: {module_name}")
-                    
+                    decompiled = await decompile_with_revela(bytecode, source_file)
                 except Exception as e:
-                    logger.error(f"Failed to decode bytecode for module {module_name}: {e}")
-                    continue
+                    logger.error(f"Error decompiling module {module_name}: {e}")
+                    decompiled = False
             
-            # Step 4: Decompile each module using revela
-            decompiled_modules = []
-            failed_modules = []
+            if not decompiled:
+                failed_modules.append(module_name)
+                logger.error(f"Failed to decompile module: {module_name}")
+                return
             
-            for module_name, bytecode_file in bytecode_files:
+            decompiled_modules.append(module_name)
+            logger.info(f"Successfully decompiled and saved: {module_name}.move")
+            try:
+                await asyncio.to_thread(_store_cached_module, module_hash, source_file)
+            except Exception as e:
+                logger.warning(f"Failed to cache module {module_name}: {e}")
+        
+        async def decompile_worker() -> None:
+            while (item := await queue.get()) is not None:
+                module_name, base64_bytecode = item
+                try:
+                    bytecode = b64decode(base64_bytecode, validate=False)
+                except Exception as e:
+                    logger.error(f"Failed to decode bytecode for module {module_name}: {e}")
+                    continue
+                # A worker must keep draining the queue, otherwise the producer blocks forever
                 try:
-                    logger.info(f"Decompiling module: {module_name}")
-                    source_code = await decompile_with_revela(bytecode_file)
-                    
-                    if source_code:
-                        # Save source code to output directory
-                        source_file = output_dir / f"{module_name}.move"
-                        with open(source_file, 'w', encoding='utf-8') as f:
-                            f.write(source_code)
-                        
-                        decompiled_modules.append(module_name)
-                        logger.info(f"Successfully decompiled and saved: {module_name}.move")
-                    else:
-                        failed_modules.append(module_name)
-                        logger.error(f"Failed to decompile module: {module_name}")
-                        
+                    await decompile_module(module_name, bytecode)
                 except Exception as e:
                     failed_modules.append(module_name)
                     logger.error(f"Error decompiling module {module_name}: {e}")
         
-        # Step 5: Return results
-        result = {
-            "success": True,
-            "package_id": package_id,
-            "output_dir_info": "The container's workdir is used to save the sources, which is typically the local /tmp/suisource-mcp mounted dir. All sources are saved with .move extension without subdirs directly in the mounted dir. Move sources to the target specified directory if needed",
-            "total_modules": len(module_bytecode),
-            "decompiled_modules": decompiled_modules,
-            "failed_modules": failed_modules,
-            "decompiled_count": len(decompiled_modules),
-            "failed_count": len(failed_modules),
-        }
+        producer = asyncio.create_task(produce_modules())
+        try:
+            await mkdir_task
+            await asyncio.gather(producer, *[decompile_worker() for _ in range(worker_count)])
+        except BaseException:
+            producer.cancel()
+            raise
         
-        logger.info(f"Decompilation completed: {len(decompiled_modules)}/{len(module_bytecode)} modules successful")
-        return result
+        if download_error is not None or not total_modules:
+            # Don't leave an empty directory behind for packages that could not be downloaded
+            with suppress(OSError):
+                output_dir.rmdir()
+        
+        if download_error is not None:
+            return {
+                "success": False,
+                "error": f"Failed to download bytecode: {download_error}"
+            }
+        
+        if not total_modules:
+            return {
+                "success": False,
+                "error": "Failed to download bytecode - package not found or no modules"
+            }
+        
+        # Only fully decompiled packages are cached, failures may be transient
+        if not failed_modules and len(decompiled_modules) == total_modules:
+            try:
+                await asyncio.to_thread(_store_cached_package, package_id, module_hashes)
+            except Exception as e:
+                logger.warning(f"Failed to cache package {package_id}: {e}")
+        
+        try:
+            await asyncio.to_thread(_evict_workdir, package_id)
+        except Exception as e:
+            logger.warning(f"Failed to evict old packages from the workdir: {e}")
+        
+        # Step 3: Return results
+        logger.info(f"Decompilation completed: {len(decompiled_modules)}/{total_modules} modules successful")
+        return _source_code_result(package_id, total_modules, decompiled_modules, failed_modules, cached=False)
         
     except Exception as e:
         logger.error(f"Error in get_source_code: {e}")
@@ -175,116 +535,416 @@ async def _get_source_code_impl(package_id: str) -> dict:
         }
 
 
-async def download_package_bytecode(package_id: str) -> Dict[str, str]:
+def _source_code_result(
+    package_id: str,
+    total_modules: int,
+    decompiled_modules: List[str],
+    failed_modules: List[str],
+    cached: bool
+) -> dict:
+    """Build the get_source_code response."""
+    return {
+        "success": True,
+        "package_id": package_id,
+        "output_dir_info": _OUTPUT_DIR_INFO,
+        "output_subdir": package_id,
+        "total_modules": total_modules,
+        "decompiled_modules": decompiled_modules,
+        "failed_modules": failed_modules,
+        "decompiled_count": len(decompiled_modules),
+        "failed_count": len(failed_modules),
+        "cached": cached,
+    }
+
+
+def _bytecode_hash(bytecode: bytes) -> str:
+    """Content hash used as the cache key for a module's bytecode."""
+    return hashlib.blake2b(bytecode, digest_size=20).hexdigest()
+
+
+def _cached_module_path(module_hash: str) -> Path:
+    return Path(CACHE_DIR) / "modules" / f"{module_hash}.move"
+
+
+def _cached_package_path(package_id: str) -> Path:
+    return Path(CACHE_DIR) / "packages" / f"{package_id}.json"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write a cache file so that readers never see a partially written one."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Cache writes run in worker threads, so the temporary name is unique per thread
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _restore_cached_module(module_hash: str, source_file: Path) -> bool:
+    """
+    Copy a cached decompiled module to the output file.
+    
+    Returns:
+        True on a cache hit, False if the module isn't cached
+    """
+    try:
+        shutil.copyfile(_cached_module_path(module_hash), source_file)
+        return True
+    except OSError:
+        return False
+
+
+def _store_cached_module(module_hash: str, source_file: Path) -> None:
+    _write_atomic(_cached_module_path(module_hash), source_file.read_bytes())
+
+
+def _load_cached_package(package_id: str) -> Optional[Dict[str, str]]:
+    """
+    Load the cached module manifest of a package.
+    
+    Returns:
+        Dict mapping module names to bytecode hashes, or None if the package isn't
+        cached or any of its modules is missing from the cache
+    """
+    try:
+        module_hashes = orjson.loads(_cached_package_path(package_id).read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    if not all(_cached_module_path(h).is_file() for h in module_hashes.values()):
+        return None
+    return module_hashes
+
+
+def _store_cached_package(package_id: str, module_hashes: Dict[str, str]) -> None:
+    """Save a package manifest and evict old packages if the cache grew too large."""
+    _write_atomic(_cached_package_path(package_id), orjson.dumps(module_hashes))
+    with _cache_lock:
+        meta = _load_cache_meta()
+        meta[package_id] = time.time()
+        _evict_cached_packages(meta)
+        _write_atomic(Path(CACHE_DIR) / "_meta.json", orjson.dumps(meta))
+
+
+def _touch_cached_package(package_id: str) -> None:
+    """Record a cache hit so that the package is evicted last."""
+    with _cache_lock:
+        meta = _load_cache_meta()
+        meta[package_id] = time.time()
+        _write_atomic(Path(CACHE_DIR) / "_meta.json", orjson.dumps(meta))
+
+
+def _load_cache_meta() -> Dict[str, float]:
+    """
+    Load the last access time of every cached package.
+    
+    Packages missing from _meta.json (or all of them, if it can't be read) fall back
+    to the access time of their manifest file.
+    """
+    try:
+        meta = orjson.loads((Path(CACHE_DIR) / "_meta.json").read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        meta = {}
+    
+    packages = {}
+    try:
+        with os.scandir(Path(CACHE_DIR) / "packages") as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and entry.is_file():
+                    package_id = entry.name[:-len(".json")]
+                    packages[package_id] = meta.get(package_id) or entry.stat().st_atime
+    except FileNotFoundError:
+        pass
+    return packages
+
+
+def _evict_cached_packages(meta: Dict[str, float]) -> None:
+    """
+    Remove least recently used packages until cached sources fit in CACHE_MAX_BYTES.
+    
+    A module file is only deleted once no remaining package references it. Modules
+    not referenced by any package (left over from failed runs) are deleted first.
+    
+    Args:
+        meta: Last access time per cached package, updated in place
+    """
+    module_sizes = {}
+    try:
+        with os.scandir(Path(CACHE_DIR) / "modules") as entries:
+            for entry in entries:
+                if entry.name.endswith(".move") and entry.is_file():
+                    module_sizes[entry.name[:-len(".move")]] = entry.stat().st_size
+    except FileNotFoundError:
+        return
+    
+    total_size = sum(module_sizes.values())
+    if total_size <= CACHE_MAX_BYTES:
+        return
+    
+    manifests = {}
+    refs: Dict[str, int] = {}
+    for package_id in meta:
+        try:
+            module_hashes = orjson.loads(_cached_package_path(package_id).read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            module_hashes = {}
+        manifests[package_id] = module_hashes
+        for module_hash in set(module_hashes.values()):
+            refs[module_hash] = refs.get(module_hash, 0) + 1
+    
+    def remove_module(module_hash: str) -> int:
+        try:
+            _cached_module_path(module_hash).unlink()
+        except FileNotFoundError:
+            pass
+        return module_sizes.pop(module_hash, 0)
+    
+    for module_hash in [h for h in module_sizes if not refs.get(h)]:
+        total_size -= remove_module(module_hash)
+    
+    for package_id in sorted(meta, key=meta.get):
+        if total_size <= CACHE_MAX_BYTES:
+            break
+        _cached_package_path(package_id).unlink(missing_ok=True)
+        del meta[package_id]
+        for module_hash in set(manifests[package_id].values()):
+            refs[module_hash] -= 1
+            if not refs[module_hash]:
+                total_size -= remove_module(module_hash)
+        logger.info(f"Evicted package {package_id} from the decompilation cache")
+
+
+def _restore_cached_package(module_hashes: Dict[str, str], output_dir: Path) -> None:
+    """Copy the cached sources of a package into the output directory, creating it if needed."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for module_name, module_hash in module_hashes.items():
+        shutil.copyfile(_cached_module_path(module_hash), output_dir / f"{module_name}.move")
+
+
+def _get_object_payload(package_id: str) -> Dict[str, Any]:
+    """Build the sui_getObject request that returns a package's module map."""
+    return {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "sui_getObject",
+        "params": [package_id, _RPC_OPTIONS]
+    }
+
+
+async def stream_package_bytecode(package_id: str) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Stream the bytecode of all modules in a Sui package from the RPC response.
+    
+    The response is parsed incrementally with ijson, so modules are yielded as soon
+    as they are read and the whole module map never has to be held in memory.
+    
+    Args:
+        package_id: The Sui package ID
+        
+    Yields:
+        Tuples of module name and base64-encoded bytecode
+    """
+    session = await _get_session()
+    async with session.post(
+        SUI_RPC_URL,
+        headers={"Content-Type": "application/json"},
+        data=orjson.dumps(_get_object_payload(package_id)),
+        timeout=_STREAM_TIMEOUT
+    ) as response:
+        if response.status != 200:
+            logger.error(f"HTTP error {response.status}: {await response.text()}")
+            return
+        
+        module_count = 0
+        module_name = None
+        async for prefix, event, value in ijson.parse_async(response.content):
+            if event == "map_key" and prefix == _MODULE_MAP_PREFIX:
+                module_name = value
+            elif event == "string" and module_name is not None and prefix.startswith(_MODULE_MAP_PREFIX):
+                module_count += 1
+                yield module_name, value
+            elif prefix == "error.message":
+                logger.error(f"RPC error: {value}")
+        
+        if not module_count:
+            logger.warning("No moduleMap found in response")
+        else:
+            logger.info(f"Retrieved bytecode for {module_count} modules")
+
+
+@_async_ttl_cache(ttl=MODULE_LIST_CACHE_TTL, maxsize=MODULE_LIST_CACHE_SIZE)
+async def list_package_modules(package_id: str) -> List[str]:
     """
-    Download bytecode for all modules in a Sui package.
+    Get the module names of a Sui package.
+    
+    The JSON-RPC API has no option that returns module names without their bytecode,
+    so the response is stream-parsed with ijson and only the module map keys are
+    kept. Results are cached in memory for a few minutes.
     
     Args:
         package_id: The Sui package ID
         
     Returns:
-        Dict mapping module names to base64-encoded bytecode
+        List of module names, empty if the package wasn't found
     """
     try:
-        # Prepare RPC request
-        rpc_payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "sui_getObject",
-            "params": [
-                package_id,
-                {
-                    "showType": True,
-                    "showOwner": True,
-                    "showPreviousTransaction": True,
-                    "showDisplay": True,
-                    "showContent": True,
-                    "showBcs": True,
-                    "showStorageRebate": True
-                }
-            ]
-        }
-        
-        # Make HTTP request to Sui RPC
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                SUI_RPC_URL,
-                headers={"Content-Type": "application/json"},
-                json=rpc_payload
-            ) as response:
-                if response.status != 200:
-                    logger.error(f"HTTP error {response.status}: {await response.text()}")
-                    return {}
-                
-                data = await response.json()
-                
-                # Check for RPC errors
-                if "error" in data:
-                    logger.error(f"RPC error: {data['error']}")
-                    return {}
-                
-                # Extract module map from response
-                result = data.get("result", {})
-                bcs_data = result.get("data", {}).get("bcs", {})
-                module_map = bcs_data.get("moduleMap", {})
-                
-                if not module_map:
-                    logger.warning("No moduleMap found in response")
-                    return {}
-                
-                logger.info(f"Retrieved bytecode for {len(module_map)} modules")
-                return module_map
+        session = await _get_session()
+        async with session.post(
+            SUI_RPC_URL,
+            headers={"Content-Type": "application/json"},
+            data=orjson.dumps(_get_object_payload(package_id))
+        ) as response:
+            if response.status != 200:
+                logger.error(f"HTTP error {response.status}: {await response.text()}")
+                return []
+            
+            module_names = []
+            async for prefix, event, value in ijson.parse_async(response.content):
+                if event == "map_key" and prefix == _MODULE_MAP_PREFIX:
+                    module_names.append(value)
+                elif prefix == "error.message":
+                    logger.error(f"RPC error: {value}")
+            
+            if not module_names:
+                logger.warning("No moduleMap found in response")
+            return module_names
                 
     except Exception as e:
-        logger.error(f"Error downloading bytecode: {e}")
-        return {}
+        logger.error(f"Error listing package modules: {e}")
+        return []
+
+
+def _write_pipe(fd: int, data: bytes) -> None:
+    """Write data to a pipe and close it, ignoring a reader that exits early."""
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    except BrokenPipeError:
+        pass
+    finally:
+        os.close(fd)
 
 
-async def decompile_with_revela(bytecode_file: Path) -> str:
+async def _run_revela(bytecode_path: str, source_file: Path, stdin_data: Optional[bytes] = None) -> bool:
     """
-    Use revela binary to decompile bytecode file to Move source code.
+    Run the revela binary on a bytecode path, writing its output straight to a file.
     
     Args:
-        bytecode_file: Path to the bytecode file
+        bytecode_path: Path passed to revela's -b option
+        source_file: File that receives the decompiled source, removed if revela fails
+        stdin_data: Bytes written to revela's stdin, if any
         
     Returns:
-        Decompiled Move source code as string, or empty string if failed
+        True if the module was decompiled, False otherwise
     """
     try:
         # Run revela command
-        cmd = ["revela", "-b", str(bytecode_file)]
+        cmd = [REVELA_BIN, "-b", bytecode_path]
         
         logger.debug(f"Running command: {' '.join(cmd)}")
         
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=30  # 30 second timeout
-        )
+        # stdin is a real pipe rather than asyncio.subprocess.PIPE: uvloop connects PIPE
+        # through a socketpair, and /dev/stdin can't be opened on a socket
+        stdin = asyncio.subprocess.DEVNULL
+        stdin_write = None
+        if stdin_data is not None:
+            stdin, stdin_write = os.pipe()
         
-        if result.returncode == 0:
-            return result.stdout.strip()
-        else:
-            logger.error(f"Revela failed with code {result.returncode}: {result.stderr}")
-            return ""
+        writer = None
+        try:
+            with open(source_file, 'wb') as out:
+                proc = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdin=stdin,
+                    stdout=out,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                if stdin_write is not None:
+                    os.close(stdin)
+                    stdin = asyncio.subprocess.DEVNULL
+                    writer = asyncio.create_task(asyncio.to_thread(_write_pipe, stdin_write, stdin_data))
+                    stdin_write = None
+                try:
+                    _, stderr = await asyncio.wait_for(
+                        proc.communicate(),
+                        timeout=30  # 30 second timeout
+                    )
+                except asyncio.TimeoutError:
+                    proc.kill()
+                    await proc.wait()
+                    raise
+        finally:
+            # Closed only if the process could not be started
+            if stdin_write is not None:
+                os.close(stdin)
+                os.close(stdin_write)
+            if writer is not None:
+                await writer
+        
+        if proc.returncode == 0 and source_file.stat().st_size > 0:
+            return True
+        logger.error(f"Revela failed with code {proc.returncode}: {stderr.decode('utf-8', errors='replace')}")
             
-    except subprocess.TimeoutExpired:
-        logger.error(f"Revela command timed out for {bytecode_file}")
-        return ""
+    except asyncio.TimeoutError:
+        logger.error(f"Revela command timed out for {bytecode_path}")
     except FileNotFoundError:
         logger.error("Revela binary not found. Make sure it's installed and in PATH.")
         logger.info("For local testing without Revela, install it from: https://github.com/verichains/revela/releases/tag/v1.0.0")
-        return ""
     except Exception as e:
         logger.error(f"Error running revela: {e}")
-        return ""
+    
+    source_file.unlink(missing_ok=True)
+    return False
+
+
+async def decompile_with_revela(bytecode: bytes, source_file: Path) -> bool:
+    """
+    Use revela binary to decompile module bytecode to a Move source file.
+    
+    The bytecode is piped to revela through /dev/stdin and revela's output goes
+    directly into source_file, so the source never has to be held in memory. Until
+    stdin has worked once, a failed module is retried from a temporary file (on
+    tmpfs when available). If that succeeds, revela can't read stdin here and
+    temporary files are used for the rest of the process lifetime. Once stdin is
+    known to work, failures are not retried.
+    
+    Args:
+        bytecode: Raw module bytecode
+        source_file: Destination Move source file
+        
+    Returns:
+        True if the module was decompiled, False otherwise
+    """
+    global _revela_stdin_supported
+    
+    if _revela_stdin_supported is not False:
+        if await _run_revela("/dev/stdin", source_file, bytecode):
+            _revela_stdin_supported = True
+            return True
+        if _revela_stdin_supported:
+            # Stdin works, so it's the module itself that revela can't decompile
+            return False
+    
+    with tempfile.TemporaryDirectory(dir=_BYTECODE_TMPDIR) as temp_dir:
+        bytecode_file = Path(temp_dir) / "module.bytecode"
+        async with aiofiles.open(bytecode_file, 'wb') as f:
+            await f.write(bytecode)
+        decompiled = await _run_revela(str(bytecode_file), source_file)
+    
+    if decompiled and _revela_stdin_supported is None:
+        logger.warning("Revela rejected bytecode from /dev/stdin, falling back to temporary files")
+        _revela_stdin_supported = False
+    
+    return decompiled
 
 
 @mcp.tool()
 async def get_source_code(package_id: str) -> dict:
     """
-    Download bytecode for a Sui package ID and decompile it using revela. The container's workdir is used to save the sources, which is typically the local /tmp/suisource-mcp mounted dir. All sources are saved with .move extension without subdirs directly in the mounted dir. Move sources to the target specified directory if needed.
+    Download bytecode for a Sui package ID and decompile it using revela. The container's workdir is used to save the sources, which is typically the local /tmp/suisource-mcp mounted dir. Sources are saved with .move extension into a subdir named after the package ID, e.g. /tmp/suisource-mcp/<package_id>/. Move sources to the target specified directory if needed.
     
     Args:
         package_id: The Sui package ID (hex string starting with 0x)
@@ -295,10 +955,60 @@ async def get_source_code(package_id: str) -> dict:
     return await _get_source_code_impl(package_id)
 
 
+@mcp.tool()
+async def get_source_codes(package_ids: List[str]) -> dict:
+    """
+    Download bytecode for several Sui package IDs and decompile them using revela. Each package is saved into its own subdirectory named after the package ID, typically inside the local /tmp/suisource-mcp mounted dir. Move sources to the target specified directory if needed.
+    
+    Args:
+        package_ids: The Sui package IDs (hex strings starting with 0x)
+        
+    Returns:
+        dict: Status and details of the decompilation process for every package
+    """
+    package_ids = list(dict.fromkeys(package_ids))
+    
+    # Packages that finish early must not be evicted by the ones finishing later
+    with _workdir_lock:
+        for package_id in package_ids:
+            _workdir_pinned[package_id] = _workdir_pinned.get(package_id, 0) + 1
+    try:
+        # All packages share one RPC session and the revela process limit
+        results = await asyncio.gather(*[_get_source_code_impl(package_id) for package_id in package_ids])
+        for package_id, result in zip(package_ids, results):
+            result.pop("output_dir_info", None)
+            result.setdefault("package_id", package_id)
+        
+        return {
+            "success": all(result.get("success") for result in results),
+            "output_dir_info": _OUTPUT_DIR_INFO,
+            "packages": results,
+            "package_count": len(results),
+        }
+        
+    except Exception as e:
+        logger.error(f"Error in get_source_codes: {e}")
+        return {
+            "success": False,
+            "error": f"Decompilation failed: {str(e)}"
+        }
+    finally:
+        with _workdir_lock:
+            for package_id in package_ids:
+                if _workdir_pinned[package_id] > 1:
+                    _workdir_pinned[package_id] -= 1
+                else:
+                    del _workdir_pinned[package_id]
+
+
+@_async_ttl_cache(ttl=PROJECT_INFO_CACHE_TTL, maxsize=PROJECT_INFO_CACHE_SIZE)
 async def get_project_info_from_graphql(package_id: str) -> Optional[Dict[str, Any]]:
     """
     Get project information from GraphQL API using a package ID.
     
+    Project data changes rarely, so results are cached in memory for ten minutes and
+    concurrent lookups of the same package share one GraphQL request.
+    
     Args:
         package_id: The Sui package ID
         
@@ -306,91 +1016,27 @@ async def get_project_info_from_graphql(package_id: str) -> Optional[Dict[str, A
         Project information or None if not found
     """
     try:
+        # Only the fields used by get_project_info are requested
         query = """
         fragment projectEntity on ProjectEntity {
           attributes {
             ProjectName
             publishedAt
-            SubmitterAddress
             ProjectWebsite
-            ProjectWhitepaper
             ProjectGithub
-            ProjectImage {
-              data {
-                attributes {
-                  url
-                  __typename
-                }
-                __typename
-              }
-              __typename
-            }
             FullDescription
             ShortDescription
-            DexLink
-            PoolLink
             email
-            linkedin
             discord
             twitter
             telegram
             medium
-            mirror
-            facebook
-            wechat
-            link3
-            reddit
-            slack
             categories(pagination: {start: 0, limit: -1}) {
               data {
                 attributes {
                   Category
-                  __typename
                 }
-                __typename
               }
-              __typename
-            }
-            ImgSlider {
-              data {
-                attributes {
-                  Files {
-                    data {
-                      attributes {
-                        url
-                        name
-                        __typename
-                      }
-                      __typename
-                    }
-                    __typename
-                  }
-                  isEnabled
-                  __typename
-                }
-                __typename
-              }
-              __typename
-            }
-            BackgroundImage {
-              data {
-                attributes {
-                  url
-                  __typename
-                }
-                __typename
-              }
-              __typename
-            }
-            categories_related {
-              data {
-                attributes {
-                  Category
-                  __typename
-                }
-                __typename
-              }
-              __typename
             }
             tokens(pagination: {start: 0, limit: -1}) {
               data {
@@ -398,11 +1044,8 @@ async def get_project_info_from_graphql(package_id: str) -> Optional[Dict[str, A
                   TokenId
                   TokenName
                   TokenLabel
-                  __typename
                 }
-                __typename
               }
-              __typename
             }
             contracts(pagination: {start: 0, limit: -1}) {
               data {
@@ -410,45 +1053,23 @@ async def get_project_info_from_graphql(package_id: str) -> Optional[Dict[str, A
                   ContractId
                   ContractLabel
                   ContractName
-                  __typename
-                }
-                __typename
-              }
-              __typename
-            }
-            chains {
-              data {
-                attributes {
-                  ChainName
-                  __typename
                 }
-                __typename
               }
-              __typename
             }
-            __typename
           }
-          __typename
         }
 
         query package($hash: String) {
           contracts(filters: {ContractId: {eq: $hash}, chain: {ChainName: {eq: "Sui"}}}) {
             data {
               attributes {
-                ContractName
-                ContractId
                 project {
                   data {
                     ...projectEntity
-                    __typename
                   }
-                  __typename
                 }
-                __typename
               }
-              __typename
             }
-            __typename
           }
         }
         """
@@ -467,31 +1088,107 @@ async def get_project_info_from_graphql(package_id: str) -> Optional[Dict[str, A
             'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36'
         }
 
-        async with aiohttp.ClientSession() as session:
+        session = await _get_session()
+        async with session.post(
+            GRAPHQL_URL,
+            headers=headers,
+            data=orjson.dumps(payload)
+        ) as response:
+            if response.status != 200:
+                logger.error(f"GraphQL HTTP error {response.status}: {await response.text()}")
+                return None
+            
+            data = orjson.loads(await response.read())
+            
+            if "errors" in data:
+                logger.error(f"GraphQL errors: {data['errors']}")
+                return None
+            
+            contracts = data.get("data", {}).get("contracts", {}).get("data", [])
+            if not contracts:
+                logger.warning(f"No project found for package ID: {package_id}")
+                return None
+            
+            return contracts[0].get("attributes", {}).get("project", {}).get("data", {})
+
+    except Exception as e:
+        logger.error(f"Error fetching project info from GraphQL: {e}")
+        return None
+
+
+def _query_transactions_payload(package_id: str, limit: int, request_id: int = 2) -> Dict[str, Any]:
+    """Build the suix_queryTransactionBlocks request for transactions that changed a package."""
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "suix_queryTransactionBlocks",
+        "params": [
+            {
+                "filter": {
+                    "ChangedObject": package_id
+                },
+                "options": {
+                    "showEffects": True,
+                    "showBalanceChanges": True,
+                    "showInput": True
+                }
+            },
+            None,
+            limit,
+            True  # descending order
+        ]
+    }
+
+
+async def get_packages_transactions_batched(package_ids: List[str], limit: int = 200) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+    """
+    Get transaction histories for several packages with JSON-RPC batch requests.
+    
+    Args:
+        package_ids: The Sui package IDs
+        limit: Maximum number of transactions to fetch per package
+        
+    Returns:
+        Dict mapping package IDs to their transaction data, or None if the RPC
+        provider didn't answer the batch
+    """
+    try:
+        session = await _get_session()
+        transactions = {}
+        for start in range(0, len(package_ids), RPC_BATCH_SIZE):
+            chunk = package_ids[start:start + RPC_BATCH_SIZE]
+            rpc_payload = [
+                _query_transactions_payload(package_id, limit, request_id)
+                for request_id, package_id in enumerate(chunk)
+            ]
+            
             async with session.post(
-                GRAPHQL_URL,
-                headers=headers,
-                json=payload
+                SUI_RPC_URL,
+                headers={"Content-Type": "application/json"},
+                data=orjson.dumps(rpc_payload)
             ) as response:
                 if response.status != 200:
-                    logger.error(f"GraphQL HTTP error {response.status}: {await response.text()}")
+                    logger.error(f"Batched transaction query HTTP error {response.status}: {await response.text()}")
                     return None
                 
-                data = await response.json()
-                
-                if "errors" in data:
-                    logger.error(f"GraphQL errors: {data['errors']}")
-                    return None
-                
-                contracts = data.get("data", {}).get("contracts", {}).get("data", [])
-                if not contracts:
-                    logger.warning(f"No project found for package ID: {package_id}")
-                    return None
-                
-                return contracts[0].get("attributes", {}).get("project", {}).get("data", {})
-
+                data = orjson.loads(await response.read())
+            
+            if not isinstance(data, list):
+                logger.error(f"Batched transaction query not supported: {data.get('error') if isinstance(data, dict) else data}")
+                return None
+            
+            for item in data:
+                request_id = item.get("id")
+                if not isinstance(request_id, int) or not 0 <= request_id < len(chunk):
+                    continue
+                if "error" in item:
+                    logger.error(f"Transaction query RPC error for {chunk[request_id]}: {item['error']}")
+                transactions[chunk[request_id]] = (item.get("result") or {}).get("data", [])
+        
+        return transactions
+    
     except Exception as e:
-        logger.error(f"Error fetching project info from GraphQL: {e}")
+        logger.error(f"Error fetching batched package transactions: {e}")
         return None
 
 
@@ -507,48 +1204,97 @@ async def get_package_transactions(package_id: str, limit: int = 200) -> List[Di
         List of transaction data
     """
     try:
-        rpc_payload = {
-            "jsonrpc": "2.0",
-            "id": 2,
-            "method": "suix_queryTransactionBlocks",
-            "params": [
-                {
-                    "filter": {
-                        "ChangedObject": package_id
-                    },
-                    "options": {
-                        "showEffects": True,
-                        "showBalanceChanges": True,
-                        "showInput": True
-                    }
-                },
-                None,
-                limit,
-                True  # descending order
-            ]
-        }
+        rpc_payload = _query_transactions_payload(package_id, limit)
+
+        session = await _get_session()
+        async with session.post(
+            SUI_RPC_URL,
+            headers={"Content-Type": "application/json"},
+            data=orjson.dumps(rpc_payload)
+        ) as response:
+            if response.status != 200:
+                logger.error(f"Transaction query HTTP error {response.status}: {await response.text()}")
+                return []
+            
+            data = orjson.loads(await response.read())
+            
+            if "error" in data:
+                logger.error(f"Transaction query RPC error: {data['error']}")
+                return []
+            
+            return data.get("result", {}).get("data", [])
+
+    except Exception as e:
+        logger.error(f"Error fetching package transactions: {e}")
+        return []
+
 
-        async with aiohttp.ClientSession() as session:
+async def list_packages_modules(package_ids: List[str]) -> Optional[Dict[str, List[str]]]:
+    """
+    Get the module names of several Sui packages with sui_multiGetObjects.
+    
+    Like list_package_modules, the response is stream-parsed so only the module map
+    keys of each package are kept. Packages in list_package_modules' cache aren't
+    requested again, and the fetched ones are added to it.
+    
+    Args:
+        package_ids: The Sui package IDs
+        
+    Returns:
+        Dict mapping package IDs to their module names, or None if the request failed
+    """
+    modules = {}
+    missing = []
+    for package_id in package_ids:
+        cached = list_package_modules.cache_get(package_id)
+        if cached is not None:
+            modules[package_id] = cached
+        else:
+            missing.append(package_id)
+    
+    try:
+        session = await _get_session()
+        for start in range(0, len(missing), RPC_BATCH_SIZE):
+            chunk = missing[start:start + RPC_BATCH_SIZE]
+            rpc_payload = {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "sui_multiGetObjects",
+                "params": [chunk, _RPC_OPTIONS]
+            }
+            
+            # The response carries the bytecode of the whole chunk, so only stalls time out
             async with session.post(
                 SUI_RPC_URL,
                 headers={"Content-Type": "application/json"},
-                json=rpc_payload
+                data=orjson.dumps(rpc_payload),
+                timeout=_STREAM_TIMEOUT
             ) as response:
                 if response.status != 200:
-                    logger.error(f"Transaction query HTTP error {response.status}: {await response.text()}")
-                    return []
-                
-                data = await response.json()
-                
-                if "error" in data:
-                    logger.error(f"Transaction query RPC error: {data['error']}")
-                    return []
+                    logger.error(f"HTTP error {response.status}: {await response.text()}")
+                    return None
                 
-                return data.get("result", {}).get("data", [])
-
+                # Results come back in the order of the requested IDs
+                index = -1
+                module_names: List[List[str]] = [[] for _ in chunk]
+                async for prefix, event, value in ijson.parse_async(response.content):
+                    if prefix == "result.item" and event == "start_map":
+                        index += 1
+                    elif event == "map_key" and prefix == _MULTI_MODULE_MAP_PREFIX and index < len(chunk):
+                        module_names[index].append(value)
+                    elif prefix == "error.message":
+                        logger.error(f"RPC error: {value}")
+                        return None
+            
+            for package_id, names in zip(chunk, module_names):
+                modules[package_id] = names
+                list_package_modules.cache_set(package_id, names)
+        
+        return modules
+    
     except Exception as e:
-        logger.error(f"Error fetching package transactions: {e}")
-        return []
+        logger.error(f"Error listing modules of multiple packages: {e}")
+        return None
 
 
 async def get_package_modules(package_id: str) -> List[str]:
@@ -562,20 +1308,24 @@ async def get_package_modules(package_id: str) -> List[str]:
         List of module names
     """
     try:
-        module_bytecode = await download_package_bytecode(package_id)
-        return list(module_bytecode.keys())
+        return await list_package_modules(package_id)
     except Exception as e:
         logger.error(f"Error getting package modules: {e}")
         return []
 
 
-async def get_package_info_detailed(package_id: str, project_contracts: List[Dict[str, Any]]) -> Dict[str, Any]:
+async def get_package_info_detailed(
+    package_id: str,
+    project_contracts: List[Dict[str, Any]],
+    prefetched: Optional[Tuple[List[str], List[Dict[str, Any]]]] = None
+) -> Dict[str, Any]:
     """
     Get detailed information about a specific package including modules and update history.
     
     Args:
         package_id: The Sui package ID
         project_contracts: List of all contracts in the project
+        prefetched: Module names and transactions already fetched in a batch, if any
         
     Returns:
         Package information with modules and update history
@@ -595,13 +1345,17 @@ async def get_package_info_detailed(package_id: str, project_contracts: List[Dic
                 "ContractLabel": "Package"
             }
 
-        # Get modules in this package
-        modules = await get_package_modules(package_id)
-        
-        # Get transaction history to determine last update time and version
-        transactions = await get_package_transactions(package_id, 50)
+        # Get modules in this package and the transaction history to determine
+        # last update time and version, both requests run at the same time
+        if prefetched is None:
+            modules, transactions = await asyncio.gather(
+                get_package_modules(package_id),
+                get_package_transactions(package_id, 50)
+            )
+        else:
+            modules, transactions = prefetched
         
-        last_update_time = None
+        last_update_ms = 0
         version = None
         
         if transactions:
@@ -610,7 +1364,7 @@ async def get_package_info_detailed(package_id: str, project_contracts: List[Dic
             timestamp_ms = latest_tx.get("timestampMs")
             
             if timestamp_ms:
-                last_update_time = datetime.fromtimestamp(int(timestamp_ms) / 1000).isoformat()
+                last_update_ms = int(timestamp_ms)
             
             # Look for version in effects
             effects = latest_tx.get("effects", {})
@@ -627,9 +1381,11 @@ async def get_package_info_detailed(package_id: str, project_contracts: List[Dic
             "label": package_info.get("ContractLabel", "Package"),
             "modules": modules,
             "module_count": len(modules),
-            "last_update_time": last_update_time,
+            # Formatted by get_project_info once packages are sorted by _sort_ts
+            "last_update_time": None,
             "version": version,
-            "transaction_count": len(transactions)
+            "transaction_count": len(transactions),
+            "_sort_ts": last_update_ms
         }
 
     except Exception as e:
@@ -643,7 +1399,8 @@ async def get_package_info_detailed(package_id: str, project_contracts: List[Dic
             "last_update_time": None,
             "version": None,
             "transaction_count": 0,
-            "error": str(e)
+            "error": str(e),
+            "_sort_ts": 0
         }
 
 
@@ -687,25 +1444,42 @@ async def get_project_info(package_id: str) -> dict:
         
         logger.info(f"Found {len(package_ids)} packages in project")
         
-        # Step 3: Get detailed information for each package
-        package_details = []
-        for contract_info in package_ids:
-            pkg_id = contract_info.get("ContractId")
-            if pkg_id:
-                package_detail = await get_package_info_detailed(pkg_id, contracts_data)
-                package_details.append(package_detail)
-        
-        # Step 4: Sort packages by last update time (most recent first)
-        def get_update_time(pkg):
-            update_time = pkg.get("last_update_time")
-            if update_time:
-                try:
-                    return datetime.fromisoformat(update_time)
-                except:
-                    return datetime.min
-            return datetime.min
+        # Step 3: Get detailed information for all packages. With batching enabled, module
+        # lists and transactions of all packages are fetched in a couple of requests
+        pkg_ids = [contract_info["ContractId"] for contract_info in package_ids]
+        modules_by_pkg, transactions_by_pkg = None, None
+        if SUI_RPC_BATCH and pkg_ids:
+            modules_by_pkg, transactions_by_pkg = await asyncio.gather(
+                list_packages_modules(pkg_ids),
+                get_packages_transactions_batched(pkg_ids, 50)
+            )
         
-        package_details.sort(key=get_update_time, reverse=True)
+        if modules_by_pkg is not None and transactions_by_pkg is not None:
+            package_details = [
+                await get_package_info_detailed(
+                    pkg_id,
+                    contracts_data,
+                    prefetched=(modules_by_pkg.get(pkg_id, []), transactions_by_pkg.get(pkg_id, []))
+                )
+                for pkg_id in pkg_ids
+            ]
+        else:
+            # Batching is disabled or unsupported by the provider, query packages concurrently
+            semaphore = asyncio.Semaphore(PROJECT_PACKAGE_CONCURRENCY)
+            
+            async def get_detail(pkg_id: str) -> Dict[str, Any]:
+                async with semaphore:
+                    return await get_package_info_detailed(pkg_id, contracts_data)
+            
+            package_details = list(await asyncio.gather(*[get_detail(pkg_id) for pkg_id in pkg_ids]))
+        
+        # Step 4: Sort packages by last update time (most recent first) using the raw
+        # millisecond timestamps, then format them for the response
+        package_details.sort(key=lambda pkg: pkg.get("_sort_ts", 0), reverse=True)
+        for pkg in package_details:
+            last_update_ms = pkg.pop("_sort_ts", 0)
+            if last_update_ms:
+                pkg["last_update_time"] = datetime.fromtimestamp(last_update_ms / 1000).isoformat()
         
         # Step 5: Build the complete response
         result = {
@@ -756,5 +1530,12 @@ async def get_project_info(package_id: str) -> dict:
 
 
 if __name__ == "__main__":
+    # Use the libuv based event loop where it is available (it isn't on Windows)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        logger.info("uvloop is not installed, using the default asyncio event loop")
+    
     # Run the MCP server
     mcp.run()
\ No newline at end of file